@@ -1,58 +1,265 @@
 # Import the required libraries
+import argparse
+import hashlib
+import math
+import os
 import numpy as np
+from numba import njit, prange
 import matplotlib.pyplot as plt
-from matplotlib.colors import Normalize
-from matplotlib.cm import get_cmap
+import seaborn as sns
 
-# Function to calculate put and call prices using Binomial trees
-def binomial_tree(S, K, T, r, sigma, q, N, option_type="call"):
+# Directory holding previously computed heatmap grids, keyed by a hash of the inputs
+CACHE_DIR = '.cache'
+# Bump whenever the pricing code or stored dtype changes so older grids are not reused
+CACHE_VERSION = 2
+
+# With --bs-limit, trees above this many steps are replaced by their N -> infinity limit,
+# the Black-Scholes formula. The tree converges to it at O(1/N) relative to the price
+# level, so the absolute gap grows with S; the tree is exact and used by default
+BS_SWITCHOVER_STEPS = 200
+
+# Parse command-line inputs; anything left out is prompted for interactively
+parser = argparse.ArgumentParser(description='Binomial tree option pricing heatmaps')
+parser.add_argument('--S', type=float, help='current stock price')
+parser.add_argument('--K-min', type=float, help='minimum strike price')
+parser.add_argument('--K-max', type=float, help='maximum strike price')
+parser.add_argument('--K', type=float, help='specific strike price for price output')
+parser.add_argument('--T', type=float, help='time to maturity in years')
+parser.add_argument('--r', type=float, help='risk-free interest rate in decimals')
+parser.add_argument('--sigma', type=float, help='base implied volatility in decimals')
+parser.add_argument('--q', type=float, help='dividend yield in decimals')
+parser.add_argument('--N', type=int, help='number of steps in the binomial tree')
+parser.add_argument('--gpu', action='store_true', help='price the grid on the GPU with CuPy')
+parser.add_argument('--bs-limit', action='store_true',
+                    help=f'price with the Black-Scholes limit above {BS_SWITCHOVER_STEPS} steps')
+args = parser.parse_args()
+
+# Function to take an input from the command line, falling back to an interactive prompt
+def arg_or_input(value, prompt, cast=float):
+    return value if value is not None else cast(input(prompt))
+
+# Optional GPU path for large trees (run with --gpu); CuPy is only imported when requested
+USE_GPU = args.gpu
+if USE_GPU:
+    import cupy as cp
+
+    # Fused elementwise kernel for one backward-induction step
+    @cp.fuse()
+    def induction_step(up, down, disc, p, one_m_p):
+        return disc * (p * up + one_m_p * down)
+
+# Function to calculate call and put prices together on one binomial tree
+# option_values is a preallocated float32 buffer of shape (N + 1, 2), reused across calls,
+# holding the call values in column 0 and the put values in column 1
+# error_model='numpy' keeps NumPy's inf/NaN semantics instead of raising ZeroDivisionError
+@njit(cache=True, fastmath=True, boundscheck=False, error_model='numpy')
+def binomial_tree_both(S, K, T, r, sigma, q, N, option_values):
     # Calculate parameters
     dt = T / N  # time step
-    u = np.exp(sigma * np.sqrt(dt))  # up factor
+    u = math.exp(sigma * math.sqrt(dt))  # up factor
     d = 1 / u  # down factor
-    p = (np.exp((r - q) * dt) - d) / (u - d)  # risk-neutral probability
-
-    # Initialize asset prices at maturity
-    ST = np.zeros(N + 1)
-    ST[0] = S * (d ** N)
-    for i in range(1, N + 1):
-        ST[i] = ST[i - 1] * (u / d)
+    p = (math.exp((r - q) * dt) - d) / (u - d)  # risk-neutral probability
+    disc = math.exp(-r * dt)  # one-step discount factor
+    one_m_p = 1.0 - p
+    ST_0 = S * d ** N  # lowest asset price at maturity
+    ud = u / d  # ratio between neighbouring terminal nodes
 
     # Initialize option values at maturity
-    if option_type == "call":
-        option_values = np.maximum(0, ST - K)
-    elif option_type == "put":
-        option_values = np.maximum(0, K - ST)
+    for i in range(N + 1):
+        ST_i = ST_0 * ud ** i
+        option_values[i, 0] = max(0.0, ST_i - K)
+        option_values[i, 1] = max(0.0, K - ST_i)
 
-    # Backward induction to calculate option value
+    # Backward induction to calculate both option values in the same sweep
     for j in range(N - 1, -1, -1):
         for i in range(j + 1):
-            option_values[i] = np.exp(-r * dt) * (p * option_values[i + 1] + (1 - p) * option_values[i])
+            option_values[i, 0] = disc * (p * option_values[i + 1, 0] + one_m_p * option_values[i, 0])
+            option_values[i, 1] = disc * (p * option_values[i + 1, 1] + one_m_p * option_values[i, 1])
+
+    return option_values[0, 0], option_values[0, 1]
+
+# Function to calculate call and put prices with Black-Scholes, the large-N limit of the tree
+# disc_r = exp(-r * T) and disc_q = exp(-q * T) are computed once by the caller
+@njit(cache=True, fastmath=True, boundscheck=False)
+def black_scholes_limit(S, K, T, r, sigma, q, disc_r, disc_q):
+    sqrtT = math.sqrt(T)
+    d1 = (math.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / (sigma * sqrtT)
+    d2 = d1 - sigma * sqrtT
+    Nd1 = 0.5 * math.erfc(-d1 / math.sqrt(2.0))  # standard normal CDF
+    Nd2 = 0.5 * math.erfc(-d2 / math.sqrt(2.0))
+    call_price = S * disc_q * Nd1 - K * disc_r * Nd2
+    put_price = call_price + K * disc_r - S * disc_q
+    return call_price, put_price
+
+# Function to compute the Binom(N, p) probabilities of ending on each terminal node
+# Evaluated in log space so large N does not overflow the binomial coefficients;
+# only valid for 0 < p < 1 (the caller falls back to the induction otherwise)
+@njit(cache=True, fastmath=True, boundscheck=False)
+def binomial_weights(N, p):
+    log_w = np.empty(N + 1)
+    log_norm = math.lgamma(N + 1)
+    log_p = math.log(p)
+    log_one_m_p = math.log(1.0 - p)
+    for k in range(N + 1):
+        log_w[k] = (log_norm - math.lgamma(k + 1) - math.lgamma(N - k + 1) +
+                    k * log_p + (N - k) * log_one_m_p)
+    return np.exp(log_w)
+
+# Function to price calls and puts for a whole vector of strikes on a single binomial tree
+# The asset lattice depends only on (S, sigma, N), so it is built once and priced
+# as an (N + 1, 2 * len(K_vec)) matrix: call columns first, then put columns
+# European payoffs only depend on the terminal node, so by default the price is the
+# discounted Binom(N, p) expectation (O(N)); use_tree=True runs the O(N^2) induction,
+# which is also used when p falls outside (0, 1) and the log-space weights are undefined
+@njit(cache=True, fastmath=True, boundscheck=False, error_model='numpy')
+def binomial_tree_strikes(S, K_vec, T, r, sigma, q, N, use_tree=False):
+    # Calculate parameters
+    dt = T / N  # time step
+    u = math.exp(sigma * math.sqrt(dt))  # up factor
+    d = 1 / u  # down factor
+    p = (math.exp((r - q) * dt) - d) / (u - d)  # risk-neutral probability
+    disc = math.exp(-r * dt)  # one-step discount factor
+    one_m_p = 1.0 - p
+
+    # Initialize asset prices at maturity
+    ST = S * d ** N * np.power(u / d, np.arange(N + 1))
+
+    # Initialize option values at maturity for every strike
+    # (float32 halves memory traffic; its ~7 significant digits keep the second
+    # decimal for prices below roughly 10^4)
+    n_strikes = len(K_vec)
+    V = np.empty((N + 1, 2 * n_strikes), dtype=np.float32)
+    V[:, :n_strikes] = np.maximum(0.0, ST[:, None] - K_vec[None, :])
+    V[:, n_strikes:] = np.maximum(0.0, K_vec[None, :] - ST[:, None])
+
+    # Closed-form expectation over the terminal nodes
+    if not use_tree and 0.0 < p < 1.0:
+        w = binomial_weights(N, p)
+        V0 = (math.exp(-r * T) * (w[:, None] * V).sum(axis=0)).astype(np.float32)
+        return V0[:n_strikes], V0[n_strikes:]
+
+    # Backward induction to calculate option values, kept in float32 throughout
+    disc32, p32, one_m_p32 = np.float32(disc), np.float32(p), np.float32(one_m_p)
+    for j in range(N - 1, -1, -1):
+        V[:j + 1] = disc32 * (p32 * V[1:j + 2] + one_m_p32 * V[:j + 1])
+
+    return V[0, :n_strikes], V[0, n_strikes:]
 
-    return option_values[0]
+# Function to price the full (volatility, strike) grid, one volatility row per thread
+# use_limit swaps the tree for black_scholes_limit (see BS_SWITCHOVER_STEPS)
+# Rows with sigma <= 0 have no valid tree and are left as NaN
+# disc_r = exp(-r * T) and disc_q = exp(-q * T) are computed once by the caller
+@njit(parallel=True, cache=True, fastmath=True, boundscheck=False, error_model='numpy')
+def grid_prices(S, K_vec, T, r, sig_vec, q, N, disc_r, disc_q, use_limit=False):
+    call_prices = np.full((len(sig_vec), len(K_vec)), np.nan, dtype=np.float32)
+    put_prices = np.full((len(sig_vec), len(K_vec)), np.nan, dtype=np.float32)
+    for i in prange(len(sig_vec)):
+        if sig_vec[i] <= 0:
+            continue
+        if use_limit:
+            for j in range(len(K_vec)):
+                call_prices[i, j], put_prices[i, j] = black_scholes_limit(S, K_vec[j], T, r, sig_vec[i], q,
+                                                                          disc_r, disc_q)
+        else:
+            calls, puts = binomial_tree_strikes(S, K_vec, T, r, sig_vec[i], q, N)
+            call_prices[i] = calls
+            put_prices[i] = puts
+    return call_prices, put_prices
 
-# Prompt the user for inputs
-S = float(input("Enter the current stock price (S): "))
-K_min = float(input("Enter the minimum strike price (K_min): "))
-K_max = float(input("Enter the maximum strike price (K_max): "))
+# Function to price calls and puts for a vector of strikes on the GPU with CuPy
+# Same induction as binomial_tree_strikes(use_tree=True); worth it once
+# N * n_strikes * n_sigmas reaches roughly 10^6 elementwise updates
+def binomial_tree_strikes_gpu(S, K_vec, T, r, sigma, q, N):
+    # Calculate parameters
+    dt = T / N  # time step
+    u = math.exp(sigma * math.sqrt(dt))  # up factor
+    d = 1 / u  # down factor
+    p = (math.exp((r - q) * dt) - d) / (u - d)  # risk-neutral probability
+    disc = math.exp(-r * dt)  # one-step discount factor
+    one_m_p = 1.0 - p
+
+    # Initialize asset prices and option values at maturity on the device
+    ST = S * d ** N * cp.power(u / d, cp.arange(N + 1))
+    K_gpu = cp.asarray(K_vec)
+    n_strikes = len(K_vec)
+    V = cp.empty((N + 1, 2 * n_strikes), dtype=cp.float32)
+    V[:, :n_strikes] = cp.maximum(0.0, ST[:, None] - K_gpu[None, :])
+    V[:, n_strikes:] = cp.maximum(0.0, K_gpu[None, :] - ST[:, None])
+
+    # Backward induction, one fused float32 kernel launch per time step
+    disc32, p32, one_m_p32 = np.float32(disc), np.float32(p), np.float32(one_m_p)
+    for j in range(N - 1, -1, -1):
+        V[:j + 1] = induction_step(V[1:j + 2], V[:j + 1], disc32, p32, one_m_p32)
+
+    V0 = V[0].get()
+    return V0[:n_strikes], V0[n_strikes:]
+
+# Function to price the full (volatility, strike) grid on the GPU
+# Rows with sigma <= 0 have no valid tree and are left as NaN
+def grid_prices_gpu(S, K_vec, T, r, sig_vec, q, N):
+    call_prices = np.full((len(sig_vec), len(K_vec)), np.nan, dtype=np.float32)
+    put_prices = np.full((len(sig_vec), len(K_vec)), np.nan, dtype=np.float32)
+    for i, sigma in enumerate(sig_vec):
+        if sigma <= 0:
+            continue
+        call_prices[i], put_prices[i] = binomial_tree_strikes_gpu(S, K_vec, T, r, sigma, q, N)
+    return call_prices, put_prices
+
+# Prompt the user for any inputs not given on the command line
+S = arg_or_input(args.S, "Enter the current stock price (S): ")
+K_min = arg_or_input(args.K_min, "Enter the minimum strike price (K_min): ")
+K_max = arg_or_input(args.K_max, "Enter the maximum strike price (K_max): ")
 
 # Validate the specific strike price input
+K_specific = args.K
 while True:
-    K_specific = float(input(f"Enter the specific strike price (K) for price output (must be between {K_min} and {K_max}): "))
+    K_specific = arg_or_input(K_specific, f"Enter the specific strike price (K) for price output (must be between {K_min} and {K_max}): ")
     if K_min <= K_specific <= K_max:
         break
     else:
         print(f"Error: K must be between {K_min} and {K_max}. Please enter a valid value.")
+        K_specific = None
+
+T = arg_or_input(args.T, "Enter the time to maturity (T) in years: ")
+r = arg_or_input(args.r, "Enter the risk-free interest rate (r) in decimals (e.g., 0.05 for 5%): ")
+
+# Validate the base volatility input (the tree is undefined for sigma <= 0)
+sigma_base = args.sigma
+while True:
+    sigma_base = arg_or_input(sigma_base, "Enter the base implied volatility (sigma) in decimals (e.g., 0.2 for 20%): ")
+    if sigma_base > 0:
+        break
+    else:
+        print("Error: sigma must be greater than 0. Please enter a valid value.")
+        sigma_base = None
 
-T = float(input("Enter the time to maturity (T) in years: "))
-r = float(input("Enter the risk-free interest rate (r) in decimals (e.g., 0.05 for 5%): "))
-sigma_base = float(input("Enter the base implied volatility (sigma) in decimals (e.g., 0.2 for 20%): "))
-q = float(input("Enter the dividend yield (q) in decimals (e.g., 0 for no dividend): "))
-N = int(input("Enter the number of steps in the binomial tree (N): "))
+q = arg_or_input(args.q, "Enter the dividend yield (q) in decimals (e.g., 0 for no dividend): ")
+
+# Validate the number of steps input (the tree needs at least one step)
+N = args.N
+while True:
+    N = arg_or_input(N, "Enter the number of steps in the binomial tree (N): ", cast=int)
+    if N >= 1:
+        break
+    else:
+        print("Error: N must be at least 1. Please enter a valid value.")
+        N = None
+
+# Large trees are priced with their Black-Scholes limit only when requested (the GPU is always exact)
+use_limit = args.bs_limit and N > BS_SWITCHOVER_STEPS and not USE_GPU
+method_label = 'Black-Scholes Limit' if use_limit else 'Binomial Tree Method'
+
+# Discount factors are shared by every price, so compute them once
+disc_r = math.exp(-r * T)
+disc_q = math.exp(-q * T)
 
 # Calculate the specific call and put prices
-specific_call_price = binomial_tree(S, K_specific, T, r, sigma_base, q, N, option_type="call")
-specific_put_price = binomial_tree(S, K_specific, T, r, sigma_base, q, N, option_type="put")
+if use_limit:
+    specific_call_price, specific_put_price = black_scholes_limit(S, K_specific, T, r, sigma_base, q, disc_r, disc_q)
+else:
+    # Preallocate the tree buffer holding the call and put values
+    option_values = np.empty((N + 1, 2), dtype=np.float32)
+    specific_call_price, specific_put_price = binomial_tree_both(S, K_specific, T, r, sigma_base, q, N, option_values)
 
 # Define the volatility range (-10 basis points to +10 basis points)
 volatility_range = np.arange(sigma_base - 0.1, sigma_base + 0.11, 0.03)
@@ -60,23 +267,23 @@ volatility_range = np.arange(sigma_base - 0.1, sigma_base + 0.11, 0.03)
 # Define 10 equal intervals for strike prices
 strike_prices = np.linspace(K_min, K_max, 10)
 
-# Initialize grids to store the calculated option prices
-call_prices = np.zeros((len(volatility_range), len(strike_prices)))
-put_prices = np.zeros((len(volatility_range), len(strike_prices)))
-
 # Calculate the option prices over the grid
-for i, sigma in enumerate(volatility_range):
-    for j, K in enumerate(strike_prices):
-        call_prices[i, j] = binomial_tree(S, K, T, r, sigma, q, N, option_type="call")
-        put_prices[i, j] = binomial_tree(S, K, T, r, sigma, q, N, option_type="put")
-
-# Adjust the extent to ensure the heat map covers the entire area
-extent = [
-    strike_prices.min() - (strike_prices[1] - strike_prices[0]) / 2,
-    strike_prices.max() + (strike_prices[1] - strike_prices[0]) / 2,
-    volatility_range.min() - (volatility_range[1] - volatility_range[0]) / 2,
-    volatility_range.max() + (volatility_range[1] - volatility_range[0]) / 2
-]
+cache_key = hashlib.md5(repr((CACHE_VERSION, "binomial", S, K_min, K_max, T, r, sigma_base, q, N, USE_GPU, use_limit)).encode()).hexdigest()
+cache_path = os.path.join(CACHE_DIR, f'{cache_key}.npz')
+if os.path.exists(cache_path):
+    # Inputs unchanged since a previous run, so reuse the saved grid
+    cached = np.load(cache_path)
+    call_prices, put_prices = cached['c'], cached['p']
+else:
+    if USE_GPU:
+        call_prices, put_prices = grid_prices_gpu(S, strike_prices, T, r, volatility_range, q, N)
+    else:
+        call_prices, put_prices = grid_prices(S, strike_prices, T, r, volatility_range, q, N,
+                                              disc_r, disc_q, use_limit)
+    # Only cache complete grids, so a failed or degenerate run is recomputed next time
+    if np.isfinite(call_prices).all() and np.isfinite(put_prices).all():
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        np.savez(cache_path, c=call_prices, p=put_prices)
 
 # Create the figure for both plots
 plt.figure(figsize=(12, 10))
@@ -85,60 +292,38 @@ plt.figure(figsize=(12, 10))
 plt.figtext(0.5, 0.95, f'Specific Call Price: {specific_call_price:.2f} and Put Price: {specific_put_price:.2f} for K={K_specific}, T={T} years, σ={sigma_base}, S={S}', ha='center', fontsize=14, fontweight='bold')
 
 # Plot the call option pricing heat map
-plt.subplot(2, 1, 1)  # 2 rows, 1 column, 1st subplot
-plt.imshow(call_prices, aspect='auto', cmap='viridis', origin='lower', extent=extent)
-plt.colorbar(label='Call Option Price')
+ax1 = plt.subplot(2, 1, 1)  # 2 rows, 1 column, 1st subplot
+labels = np.char.mod('%.2f', call_prices)
+# seaborn places all cell annotations in one pass and picks a contrasting text color per cell
+sns.heatmap(call_prices, annot=labels, fmt='', cmap='viridis', ax=ax1,
+            cbar_kws={'label': 'Call Option Price'})
+ax1.invert_yaxis()  # lowest volatility at the bottom
 
 # Labeling the axes
 plt.xlabel('Strike Price (K)')
 plt.ylabel('Implied Volatility (σ)')
-plt.title('Heatmap of Call Option Prices (Binomial Tree Method)')
-
-# Get the colormap and the normalization
-cmap = get_cmap('viridis')
-norm = Normalize(vmin=call_prices.min(), vmax=call_prices.max())
-
-# Displaying numbers on the plot with color contrast adjustment
-for i in range(len(volatility_range)):
-    for j in range(len(strike_prices)):
-        value = call_prices[i, j]
-        color = cmap(norm(value))
-        brightness = (0.299 * color[0] + 0.587 * color[1] + 0.114 * color[2])
-        text_color = 'white' if brightness < 0.5 else 'black'
-        plt.text(strike_prices[j], volatility_range[i], f'{value:.2f}',
-                 ha='center', va='center', color=text_color)
+plt.title(f'Heatmap of Call Option Prices ({method_label})')
 
 # Customizing ticks to place intervals in the middle of the boxes
-plt.xticks(ticks=strike_prices, labels=[f'{price:.2f}' for price in strike_prices], rotation=45)
-plt.yticks(ticks=volatility_range, labels=[f'{vol:.2f}' for vol in volatility_range])
+plt.xticks(ticks=np.arange(len(strike_prices)) + 0.5, labels=[f'{price:.2f}' for price in strike_prices], rotation=45)
+plt.yticks(ticks=np.arange(len(volatility_range)) + 0.5, labels=[f'{vol:.2f}' for vol in volatility_range], rotation=0)
 
 # Plot the put option pricing heat map
-plt.subplot(2, 1, 2)  # 2 rows, 1 column, 2nd subplot
-plt.imshow(put_prices, aspect='auto', cmap='viridis', origin='lower', extent=extent)
-plt.colorbar(label='Put Option Price')
+ax2 = plt.subplot(2, 1, 2)  # 2 rows, 1 column, 2nd subplot
+labels = np.char.mod('%.2f', put_prices)
+# seaborn places all cell annotations in one pass and picks a contrasting text color per cell
+sns.heatmap(put_prices, annot=labels, fmt='', cmap='viridis', ax=ax2,
+            cbar_kws={'label': 'Put Option Price'})
+ax2.invert_yaxis()  # lowest volatility at the bottom
 
 # Labeling the axes
 plt.xlabel('Strike Price (K)')
 plt.ylabel('Implied Volatility (σ)')
-plt.title('Heatmap of Put Option Prices (Binomial Tree Method)')
-
-# Get the colormap and the normalization
-cmap = get_cmap('viridis')
-norm = Normalize(vmin=put_prices.min(), vmax=put_prices.max())
-
-# Displaying numbers on the plot with color contrast adjustment
-for i in range(len(volatility_range)):
-    for j in range(len(strike_prices)):
-        value = put_prices[i, j]
-        color = cmap(norm(value))
-        brightness = (0.299 * color[0] + 0.587 * color[1] + 0.114 * color[2])
-        text_color = 'white' if brightness < 0.5 else 'black'
-        plt.text(strike_prices[j], volatility_range[i], f'{value:.2f}',
-                 ha='center', va='center', color=text_color)
+plt.title(f'Heatmap of Put Option Prices ({method_label})')
 
 # Customizing ticks to place intervals in the middle of the boxes
-plt.xticks(ticks=strike_prices, labels=[f'{price:.2f}' for price in strike_prices], rotation=45)
-plt.yticks(ticks=volatility_range, labels=[f'{vol:.2f}' for vol in volatility_range])
+plt.xticks(ticks=np.arange(len(strike_prices)) + 0.5, labels=[f'{price:.2f}' for price in strike_prices], rotation=45)
+plt.yticks(ticks=np.arange(len(volatility_range)) + 0.5, labels=[f'{vol:.2f}' for vol in volatility_range], rotation=0)
 
 # Show the combined plot with both heat maps
 plt.tight_layout(rect=[0, 0, 1, 0.94])
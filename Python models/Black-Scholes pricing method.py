@@ -1,43 +1,75 @@
 # Import the required libraries
+import argparse
+import hashlib
+import math
+import os
 import numpy as np
-import scipy.stats as si
+from scipy.special import ndtr
 import matplotlib.pyplot as plt
-from matplotlib.colors import Normalize
-from matplotlib.cm import get_cmap
+import seaborn as sns
+
+# Directory holding previously computed heatmap grids, keyed by a hash of the inputs
+CACHE_DIR = '.cache'
+# Bump whenever the pricing code or stored dtype changes so older grids are not reused
+CACHE_VERSION = 2
+
+# Parse command-line inputs; anything left out is prompted for interactively
+parser = argparse.ArgumentParser(description='Black-Scholes option pricing heatmaps')
+parser.add_argument('--S', type=float, help='current stock price')
+parser.add_argument('--K-min', type=float, help='minimum strike price')
+parser.add_argument('--K-max', type=float, help='maximum strike price')
+parser.add_argument('--K', type=float, help='specific strike price for price output')
+parser.add_argument('--T', type=float, help='time to maturity in years')
+parser.add_argument('--r', type=float, help='risk-free interest rate in decimals')
+parser.add_argument('--sigma', type=float, help='base implied volatility in decimals')
+parser.add_argument('--q', type=float, help='dividend yield in decimals')
+args = parser.parse_args()
+
+# Function to take an input from the command line, falling back to an interactive prompt
+def arg_or_input(value, prompt, cast=float):
+    return value if value is not None else cast(input(prompt))
 
 # Function to calculate put and call prices using Black-Scholes
-def black_scholes(S, K, T, r, sigma, q=0):
-    d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
+# disc_r = exp(-r * T) and disc_q = exp(-q * T) are computed once by the caller
+def black_scholes(S, K, T, r, sigma, q, disc_r, disc_q):
+    # T, r and q are scalars, so the math module is enough for their terms
+    sqrtT = math.sqrt(T)
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / (sigma * sqrtT)
+    d2 = d1 - sigma * sqrtT
 
-    call_price = (S * np.exp(-q * T) * si.norm.cdf(d1, 0.0, 1.0) -
-                  K * np.exp(-r * T) * si.norm.cdf(d2, 0.0, 1.0))
+    call_price = S * disc_q * ndtr(d1) - K * disc_r * ndtr(d2)
 
-    put_price = (K * np.exp(-r * T) * si.norm.cdf(-d2, 0.0, 1.0) -
-                 S * np.exp(-q * T) * si.norm.cdf(-d1, 0.0, 1.0))
+    # Put-call parity avoids a second pair of normal CDF evaluations
+    put_price = call_price + K * disc_r - S * disc_q
 
     return call_price, put_price
 
-# Prompt the user for inputs
-S = float(input("Enter the current stock price (S): "))
-K_min = float(input("Enter the minimum strike price (K_min): "))
-K_max = float(input("Enter the maximum strike price (K_max): "))
+# Prompt the user for any inputs not given on the command line
+S = arg_or_input(args.S, "Enter the current stock price (S): ")
+K_min = arg_or_input(args.K_min, "Enter the minimum strike price (K_min): ")
+K_max = arg_or_input(args.K_max, "Enter the maximum strike price (K_max): ")
 
 # Validate the specific strike price input
+K_specific = args.K
 while True:
-    K_specific = float(input(f"Enter the specific strike price (K) for price output (must be between {K_min} and {K_max}): "))
+    K_specific = arg_or_input(K_specific, f"Enter the specific strike price (K) for price output (must be between {K_min} and {K_max}): ")
     if K_min <= K_specific <= K_max:
         break
     else:
         print(f"Error: K must be between {K_min} and {K_max}. Please enter a valid value.")
+        K_specific = None
 
-T = float(input("Enter the time to maturity (T) in years: "))
-r = float(input("Enter the risk-free interest rate (r) in decimals (e.g., 0.05 for 5%): "))
-sigma_base = float(input("Enter the base implied volatility (sigma) in decimals (e.g., 0.2 for 20%): "))
-q = float(input("Enter the dividend yield (q) in decimals (e.g., 0 for no dividend): "))
+T = arg_or_input(args.T, "Enter the time to maturity (T) in years: ")
+r = arg_or_input(args.r, "Enter the risk-free interest rate (r) in decimals (e.g., 0.05 for 5%): ")
+sigma_base = arg_or_input(args.sigma, "Enter the base implied volatility (sigma) in decimals (e.g., 0.2 for 20%): ")
+q = arg_or_input(args.q, "Enter the dividend yield (q) in decimals (e.g., 0 for no dividend): ")
+
+# Discount factors are shared by every price, so compute them once
+disc_r = math.exp(-r * T)
+disc_q = math.exp(-q * T)
 
 # Calculate the specific call and put prices
-specific_call_price, specific_put_price = black_scholes(S, K_specific, T, r, sigma_base, q)
+specific_call_price, specific_put_price = black_scholes(S, K_specific, T, r, sigma_base, q, disc_r, disc_q)
 
 # Define the volatility range (-10 basis points to +10 basis points)
 volatility_range = np.arange(sigma_base - 0.1, sigma_base + 0.11, 0.03)
@@ -45,24 +77,23 @@ volatility_range = np.arange(sigma_base - 0.1, sigma_base + 0.11, 0.03)
 # Define 10 equal intervals for strike prices
 strike_prices = np.linspace(K_min, K_max, 10)
 
-# Initialize grids to store the calculated option prices
-call_prices = np.zeros((len(volatility_range), len(strike_prices)))
-put_prices = np.zeros((len(volatility_range), len(strike_prices)))
-
-# Calculate the option prices over the grid
-for i, sigma in enumerate(volatility_range):
-    for j, K in enumerate(strike_prices):
-        call_price, put_price = black_scholes(S, K, T, r, sigma, q)
-        call_prices[i, j] = call_price
-        put_prices[i, j] = put_price
-
-# Adjust the extent to ensure the heat map covers the entire area
-extent = [
-    strike_prices.min() - (strike_prices[1] - strike_prices[0]) / 2,
-    strike_prices.max() + (strike_prices[1] - strike_prices[0]) / 2,
-    volatility_range.min() - (volatility_range[1] - volatility_range[0]) / 2,
-    volatility_range.max() + (volatility_range[1] - volatility_range[0]) / 2
-]
+# Calculate the option prices over the whole grid with a single broadcasted call,
+# so ndtr runs once over every cell (volatilities down the rows, strikes across)
+cache_key = hashlib.md5(repr((CACHE_VERSION, "black_scholes", S, K_min, K_max, T, r, sigma_base, q)).encode()).hexdigest()
+cache_path = os.path.join(CACHE_DIR, f'{cache_key}.npz')
+if os.path.exists(cache_path):
+    # Inputs unchanged since a previous run, so reuse the saved grid
+    cached = np.load(cache_path)
+    call_prices, put_prices = cached['c'], cached['p']
+else:
+    # Price in float64 and only store the finished grids as float32: the put-call parity
+    # subtraction cancels badly in float32 once S and K are large
+    call_prices, put_prices = black_scholes(S, strike_prices[None, :], T, r, volatility_range[:, None], q, disc_r, disc_q)
+    call_prices, put_prices = call_prices.astype(np.float32), put_prices.astype(np.float32)
+    # Only cache complete grids, so a failed or degenerate run is recomputed next time
+    if np.isfinite(call_prices).all() and np.isfinite(put_prices).all():
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        np.savez(cache_path, c=call_prices, p=put_prices)
 
 # Create the figure for both plots
 plt.figure(figsize=(10, 8))
@@ -71,60 +102,38 @@ plt.figure(figsize=(10, 8))
 plt.figtext(0.5, 0.95, f'Call Price: {specific_call_price:.2f} and Put Price: {specific_put_price:.2f} for K={K_specific}, T={T} years, σ={sigma_base}, S={S}', ha='center', fontsize=14, fontweight='bold')
 
 # Plot the call option pricing heat map
-plt.subplot(2, 1, 1)  # 2 rows, 1 column, 1st subplot
-plt.imshow(call_prices, aspect='auto', cmap='viridis', origin='lower', extent=extent)
-plt.colorbar(label='Call Option Price')
+ax1 = plt.subplot(2, 1, 1)  # 2 rows, 1 column, 1st subplot
+labels = np.char.mod('%.2f', call_prices)
+# seaborn places all cell annotations in one pass and picks a contrasting text color per cell
+sns.heatmap(call_prices, annot=labels, fmt='', cmap='viridis', ax=ax1,
+            cbar_kws={'label': 'Call Option Price'})
+ax1.invert_yaxis()  # lowest volatility at the bottom
 
 # Labeling the axes
 plt.xlabel('Strike Price (K)')
 plt.ylabel('Implied Volatility (σ)')
 plt.title('Heatmap of Call Option Prices')
 
-# Get the colormap and the normalization
-cmap = get_cmap('viridis')
-norm = Normalize(vmin=call_prices.min(), vmax=call_prices.max())
-
-# Displaying numbers on the plot with color contrast adjustment
-for i in range(len(volatility_range)):
-    for j in range(len(strike_prices)):
-        value = call_prices[i, j]
-        color = cmap(norm(value))
-        brightness = (0.299 * color[0] + 0.587 * color[1] + 0.114 * color[2])
-        text_color = 'white' if brightness < 0.5 else 'black'
-        plt.text(strike_prices[j], volatility_range[i], f'{value:.2f}',
-                 ha='center', va='center', color=text_color)
-
 # Customizing ticks to place intervals in the middle of the boxes
-plt.xticks(ticks=strike_prices, labels=[f'{price:.2f}' for price in strike_prices], rotation=45)
-plt.yticks(ticks=volatility_range, labels=[f'{vol:.2f}' for vol in volatility_range])
+plt.xticks(ticks=np.arange(len(strike_prices)) + 0.5, labels=[f'{price:.2f}' for price in strike_prices], rotation=45)
+plt.yticks(ticks=np.arange(len(volatility_range)) + 0.5, labels=[f'{vol:.2f}' for vol in volatility_range], rotation=0)
 
 # Plot the put option pricing heat map
-plt.subplot(2, 1, 2)  # 2 rows, 1 column, 2nd subplot
-plt.imshow(put_prices, aspect='auto', cmap='viridis', origin='lower', extent=extent)
-plt.colorbar(label='Put Option Price')
+ax2 = plt.subplot(2, 1, 2)  # 2 rows, 1 column, 2nd subplot
+labels = np.char.mod('%.2f', put_prices)
+# seaborn places all cell annotations in one pass and picks a contrasting text color per cell
+sns.heatmap(put_prices, annot=labels, fmt='', cmap='viridis', ax=ax2,
+            cbar_kws={'label': 'Put Option Price'})
+ax2.invert_yaxis()  # lowest volatility at the bottom
 
 # Labeling the axes
 plt.xlabel('Strike Price (K)')
 plt.ylabel('Implied Volatility (σ)')
 plt.title('Heatmap of Put Option Prices (Black-Scholes Method)')
 
-# Get the colormap and the normalization
-cmap = get_cmap('viridis')
-norm = Normalize(vmin=put_prices.min(), vmax=put_prices.max())
-
-# Displaying numbers on the plot with color contrast adjustment
-for i in range(len(volatility_range)):
-    for j in range(len(strike_prices)):
-        value = put_prices[i, j]
-        color = cmap(norm(value))
-        brightness = (0.299 * color[0] + 0.587 * color[1] + 0.114 * color[2])
-        text_color = 'white' if brightness < 0.5 else 'black'
-        plt.text(strike_prices[j], volatility_range[i], f'{value:.2f}',
-                 ha='center', va='center', color=text_color)
-
 # Customizing ticks to place intervals in the middle of the boxes
-plt.xticks(ticks=strike_prices, labels=[f'{price:.2f}' for price in strike_prices], rotation=45)
-plt.yticks(ticks=volatility_range, labels=[f'{vol:.2f}' for vol in volatility_range])
+plt.xticks(ticks=np.arange(len(strike_prices)) + 0.5, labels=[f'{price:.2f}' for price in strike_prices], rotation=45)
+plt.yticks(ticks=np.arange(len(volatility_range)) + 0.5, labels=[f'{vol:.2f}' for vol in volatility_range], rotation=0)
 
 # Show the combined plot with both heat maps
 plt.tight_layout(rect=[0, 0, 1, 0.94])